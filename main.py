@@ -1,8 +1,13 @@
-from collections import UserDict
-from datetime import datetime
-import json
+from datetime import date
+from functools import lru_cache
+import mmap
+import orjson
+import re
+import sys
 from abc import ABC, abstractmethod
 
+_PHONE_RE = re.compile(r'\A[0-9]{10}\Z').match
+
 class UserInterface(ABC):
     @abstractmethod
     def display_options(self):
@@ -42,136 +47,215 @@ class ConsoleInterface(UserInterface):
 
 
 class Field:
+    __slots__ = ('value',)
+
     def __init__(self, value):
-        self.__value = None
         self.value = value
 
     def __str__(self):
         return str(self.value)
-    
-    @property
-    def value(self):
-        return self.__value
-
-    @value.setter
-    def value(self, value):
-        self.__value = value
 
 
 class Name(Field):
-    pass
+    __slots__ = ()
 
 
 class Birthday(Field):
-    @Field.value.setter
-    def value(self, value: str):
+    __slots__ = ()
+
+    def __init__(self, value: str):
+        digits = value[0:4] + value[5:7] + value[8:10]
+        if len(value) != 10 or value[4] != '-' or value[7] != '-' or not (digits.isascii() and digits.isdigit()):
+            raise ValueError("Invalid birthday format. Use YYYY-MM-DD")
         try:
-            self._Field__value = datetime.strptime(value, '%Y-%m-%d').date()
+            self.value = date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
         except ValueError:
             raise ValueError("Invalid birthday format. Use YYYY-MM-DD")
 
 
 class Phone(Field):
+    __slots__ = ()
+
     def __init__(self, value):
-        super().__init__(value)
+        if not _PHONE_RE(value):
+            raise ValueError("Invalid phone number format. Phone not added.")
+        self.value = sys.intern(value)
+
+    @classmethod
+    def trusted(cls, value):
+        phone = cls.__new__(cls)
+        phone.value = sys.intern(value)
+        return phone
+
+
+def _birthday_ordinal(year, month, day):
+    try:
+        return date(year, month, day).toordinal()
+    except ValueError:
+        # Feb 29 birthdays fall on Mar 1 in non-leap years.
+        return date(year, 3, 1).toordinal()
+
+
+@lru_cache(maxsize=1024)
+def _days_until(today, month, day):
+    ord_today = today.toordinal()
+    ord_birthday = _birthday_ordinal(today.year, month, day)
+
+    if ord_birthday < ord_today:
+        ord_birthday = _birthday_ordinal(today.year + 1, month, day)
+
+    return ord_birthday - ord_today
 
-    @Field.value.setter
-    def value(self, value):
-        if value.isdigit() and len(value) == 10:
-            self._Field__value = value
-        else:
-            raise ValueError ("Invalid phone number format. Phone not added.")
-    
 
 class Record:
+    __slots__ = ('name', 'name_lower', 'phones', 'birthday', '_phones_joined', '_phones_by_value',
+                 '_bday_md')
+
     def __init__(self, name, birthday=None):
         self.name = Name(name)
+        self.name_lower = name.lower()
         self.phones = []
         self.birthday = Birthday(birthday) if birthday else None
+        self._bday_md = (self.birthday.value.month, self.birthday.value.day) if self.birthday else None
+        self._phones_joined = ''
+        self._phones_by_value = {}
 
     def __str__(self):
         return f"Contact name: {self.name.value}, phones: {'; '.join(p.value for p in self.phones)}"
 
+    def _refresh_phones(self):
+        self._phones_joined = '|'.join(p.value for p in self.phones)
+        self._phones_by_value = {}
+        for p in self.phones:
+            self._phones_by_value.setdefault(p.value, p)
+
     def add_phone(self, phone):
         self.phones.append(Phone(phone))
+        self._refresh_phones()
 
     def remove_phone(self, phone):
-        self.phones = [p for p in self.phones if p.value != phone]
+        for i, p in enumerate(self.phones):
+            if p.value == phone:
+                del self.phones[i]
+                self._refresh_phones()
+                return
 
     def edit_phone(self, old_phone, new_phone):
-        if not any(p.value == old_phone for p in self.phones):
-            raise ValueError("Phone number not found.")
-        
-        self.remove_phone(old_phone)
-        self.add_phone(new_phone)
+        for i, p in enumerate(self.phones):
+            if p.value == old_phone:
+                self.phones[i] = Phone(new_phone)
+                self._refresh_phones()
+                return
+
+        raise ValueError("Phone number not found.")
         
     def find_phone(self, phone):
-        for p in self.phones:
-            if p.value == phone:
-                return p
-        return None
+        return self._phones_by_value.get(phone)
     
-    def days_to_birthday(self):
-        if not self.birthday:
+    def days_to_birthday(self, today=None):
+        if self._bday_md is None:
             return None
-        
-        today = datetime.today()
-        next_birthday = datetime(today.year, self.birthday.value.month, self.birthday.value.day)
 
-        if today > next_birthday:
-            next_birthday = datetime(today.year + 1, self.birthday.value.month, self.birthday.value.day)
+        if today is None:
+            today = date.today()
+        return _days_until(today, *self._bday_md)
 
-        days_left = (next_birthday - today).days
-        return days_left
 
+class AddressBookLoadError(Exception):
+    pass
+
+
+class AddressBook(dict):
+    def __init__(self, *args, filename=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._filename = filename
+        self._loaded = filename is None
+
+    def _ensure_loaded(self, user_interface=None):
+        if self._loaded:
+            return
+        stored = AddressBook()
+        try:
+            stored.load_from_file(self._filename)
+        except FileNotFoundError:
+            message = "No existing address book found."
+        except (OSError, ValueError, KeyError) as error:
+            raise AddressBookLoadError(f"Could not load address book from {self._filename}: {error}") from error
+        else:
+            message = "Address book loaded successfully."
+        stored.update(self)
+        self.clear()
+        self.update(stored)
+        self._loaded = True
+        if user_interface is not None:
+            user_interface.display_message(message)
 
-class AddressBook(UserDict):
     def add_record(self, record: Record):
-        self.data[record.name.value] = record
+        name = record.name.value = sys.intern(record.name.value)
+        self[name] = record
 
     def find(self, query):
+        self._ensure_loaded()
+        query_lower = query.lower()
+        # Phones are joined with '|', so a query containing it must not match across two numbers.
+        match_phones = '|' not in query
         results = []
-        for name, record in self.data.items():
-            if query.lower() in name.lower():
+        for record in self.values():
+            if query_lower in record.name_lower:
+                results.append(record)
+            elif match_phones and query in record._phones_joined:
                 results.append(record)
-            else:
-                for phone in record.phones:
-                    if query in phone.value:
-                        results.append(record)
-                        break
         return results
 
     def delete(self, name):
-        if name in self.data:
-            del self.data[name]
+        self._ensure_loaded()
+        if name in self:
+            del self[name]
 
     def iterator(self, item_number):
-        counter = 0
-        result = ''
-        for item, record in self.data.items():
-            result += f'{item}: {record}'
-            counter += 1
-            if counter >= item_number:
-                yield result
-                counter = 0
-                result = ''
-
-    def save_to_file(self, filename):
-        with open(filename, 'w') as file:
-            data_to_save = {
-                'records': {name: {'phones': [phone.value for phone in record.phones],
-                                   'birthday': str(record.birthday.value) if record.birthday else None}
-                            for name, record in self.data.items()}
-            }
-            json.dump(data_to_save, file)
+        self._ensure_loaded()
+        parts = []
+        for item, record in self.items():
+            parts.append(f'{item}: {record}')
+            if len(parts) >= item_number:
+                yield ''.join(parts)
+                parts = []
+        if parts:
+            yield ''.join(parts)
+
+    def save_to_file(self, filename, user_interface=None):
+        try:
+            self._ensure_loaded(user_interface)
+        except AddressBookLoadError as error:
+            unsaved_filename = f'{filename}.new'
+            self._write_records(unsaved_filename)
+            raise AddressBookLoadError(f"{error}. Contacts from this session were saved to {unsaved_filename}") from error
+        self._write_records(filename)
+
+    def _write_records(self, filename):
+        with open(filename, 'wb') as file:
+            file.write(b'{"records":{')
+            first = True
+            for name, record in self.items():
+                if not first:
+                    file.write(b',')
+                first = False
+                file.write(orjson.dumps(name))
+                file.write(b':')
+                file.write(orjson.dumps({'phones': [phone.value for phone in record.phones],
+                                         'birthday': record.birthday.value if record.birthday else None}))
+            file.write(b'}}')
 
     def load_from_file(self, filename):
-        with open(filename, 'r') as file:
-            data = json.load(file)
+        with open(filename, 'rb') as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                data = orjson.loads(view)
+            if not isinstance(data, dict) or not isinstance(data.get('records'), dict):
+                raise ValueError("Invalid address book format")
             for name, record_data in data['records'].items():
                 record = Record(name, birthday=record_data['birthday'])
-                for phone in record_data['phones']:
-                    record.add_phone(phone)
+                record.phones = [Phone.trusted(phone) for phone in record_data['phones']]
+                record._refresh_phones()
                 self.add_record(record)
 
     def add_contact(self, user_interface):
@@ -186,68 +270,73 @@ class AddressBook(UserDict):
         user_interface.display_message("Contact added successfully.")
 
     def delete_contact(self, user_interface):
+        self._ensure_loaded(user_interface)
         name = user_interface.get_user_input("Enter contact name to delete: ")
         self.delete(name)
         user_interface.display_message("Contact deleted successfully.")
 
     def search_contacts(self, user_interface):
+        self._ensure_loaded(user_interface)
         query = user_interface.get_user_input("Enter name or phone number to search: ")
         results = self.find(query)
     
         if results:
             user_interface.display_message("Search results:")
-            for result in results:
-                print(result)
+            sys.stdout.write('\n'.join(str(result) for result in results) + '\n')
         else:
             user_interface.display_message("No matching contacts found.")
 
     def show_all_contacts(self, user_interface):
-        if self.data:
+        self._ensure_loaded(user_interface)
+        if self:
             user_interface.display_message("\nAll contacts:")
-            for record in self.data.values():
-                print(record)
+            sys.stdout.write('\n'.join(str(record) for record in self.values()) + '\n')
 
     def show_all_contacts_with_birthdays(self, user_interface):
-        today = datetime.today().date()
+        self._ensure_loaded(user_interface)
+        today = date.today()
         upcoming_birthdays = []
 
         for record in self.values():
-            days_left = record.days_to_birthday()
+            days_left = record.days_to_birthday(today)
             if days_left is not None:  
                 upcoming_birthdays.append((record, days_left))
 
         if upcoming_birthdays:
             user_interface.display_message("\nUpcoming birthdays:")
-            for record, days_left in upcoming_birthdays:
-                print(f"{record.name.value}: {record.birthday.value} (in {days_left} days)")
+            sys.stdout.write('\n'.join(f"{record.name.value}: {record.birthday.value} (in {days_left} days)"
+                                        for record, days_left in upcoming_birthdays) + '\n')
+
+_ACTIONS = {
+    '1': AddressBook.add_contact,
+    '2': AddressBook.delete_contact,
+    '3': AddressBook.search_contacts,
+    '4': AddressBook.show_all_contacts,
+    '5': AddressBook.show_all_contacts_with_birthdays,
+}
+
 
 def main():
-    address_book = AddressBook()
+    address_book = AddressBook(filename='address_book.json')
     console_interface = ConsoleInterface()
 
-    try:
-        address_book.load_from_file('address_book.json')
-        console_interface.display_message("Address book loaded successfully.")
-    except FileNotFoundError:
-        console_interface.display_message("No existing address book found.")
-
     while True:
         console_interface.display_options()
         choice = console_interface.get_user_choice()
 
-        if choice == '1':
-            address_book.add_contact(console_interface)
-        elif choice == '2':
-            address_book.delete_contact(console_interface)
-        elif choice == '3':
-            address_book.search_contacts(console_interface)
-        elif choice == '4':
-            address_book.show_all_contacts(console_interface)
-        elif choice == '5':
-            address_book.show_all_contacts_with_birthdays(console_interface)
+        action = _ACTIONS.get(choice)
+        if action:
+            try:
+                action(address_book, console_interface)
+            except AddressBookLoadError as error:
+                console_interface.display_message(str(error))
         elif choice == '6':
-            address_book.save_to_file('address_book.json')
-            console_interface.display_message("Address book saved. Exiting...")
+            try:
+                address_book.save_to_file('address_book.json', console_interface)
+            except AddressBookLoadError as error:
+                console_interface.display_message(f"{error}\nExiting...")
+            else:
+                console_interface.display_message("Address book saved. Exiting...")
             break
         else:
             console_interface.display_message("Invalid choice. Please enter a number between 1 and 6.")